@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Analyzer Daemon
+
+Processo locale long-lived che espone RepositoryAnalyzer e MetadataManager
+via JSON-RPC 2.0 su Unix socket:
+- Evita l'avvio dell'interprete a ogni chiamata delle skill TypeScript
+- Mantiene warm i MetadataManager (lock, dizionari zstd, indice) tra le chiamate
+- Protocollo: una richiesta JSON per riga, una risposta JSON per riga
+
+Metodi:
+- ping, shutdown
+- analyze {repo_path, max_age?}
+- validate_files {paths, workers?, pattern?, require_frontmatter?}
+- metadata.<method> {meta_path, args?, kwargs?, options?}
+"""
+
+import os
+import sys
+import json
+import socket
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+JSONRPC_VERSION = "2.0"
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+def default_socket_path() -> str:
+    """Path del socket: env, XDG_RUNTIME_DIR o /tmp per utente"""
+    env_path = os.environ.get("SPEC_ZERO_DAEMON_SOCKET")
+    if env_path:
+        return env_path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "spec-zero-lite.sock")
+    return f"/tmp/spec-zero-lite-{os.getuid()}.sock"
+
+
+def _to_json(obj: Any) -> Any:
+    """Serializza dataclass come dict, il resto come stringa"""
+    if hasattr(obj, "__dataclass_fields__"):
+        return vars(obj)
+    return str(obj)
+
+
+def _call_with_params(handler, args: list, kwargs: dict) -> Any:
+    """Chiama handler, INVALID_PARAMS se args/kwargs non combaciano con la firma"""
+    import inspect
+
+    try:
+        inspect.signature(handler).bind(*args, **kwargs)
+    except TypeError as e:
+        raise RpcError(INVALID_PARAMS, str(e))
+    return handler(*args, **kwargs)
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class AnalyzerDaemon:
+    """Dispatcher JSON-RPC con cache warm di analyzer e metadata manager"""
+
+    def __init__(self, socket_path: str, idle_timeout: Optional[float] = None):
+        # Import pesanti fatti una volta sola all'avvio del daemon
+        import metadata_manager
+        import repo_analyzer
+
+        self.metadata_manager = metadata_manager
+        self.repo_analyzer = repo_analyzer
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.started_at = time.time()
+        self.last_request = self.started_at
+        self.requests = 0
+        self._managers: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+        self._analyses: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server: Optional[socket.socket] = None
+        # Richieste in corso e handler attivi, per idle timeout e drain allo shutdown
+        self._active = 0
+        self._draining = False
+        self._active_cond = threading.Condition()
+        self._handlers: Dict[threading.Thread, socket.socket] = {}
+
+    # ===== Methods =====
+
+    def ping(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_s": time.time() - self.started_at,
+            "requests": self.requests,
+            "managers": len(self._managers),
+            "analyses": len(self._analyses),
+        }
+
+    def shutdown(self) -> bool:
+        self._stop.set()
+        return True
+
+    def analyze(self, repo_path: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Analisi repository, riusa il risultato se più recente di max_age secondi"""
+        repo_path = os.path.abspath(repo_path)
+        if max_age is not None:
+            with self._cache_lock:
+                cached = self._analyses.get(repo_path)
+            if cached and time.time() - cached[0] <= max_age:
+                return cached[1]
+
+        analysis = self.repo_analyzer.RepositoryAnalyzer(repo_path).analyze()
+        # Round-trip JSON invece di asdict: directory_structure contiene un
+        # defaultdict che asdict non sa copiare prima di Python 3.12
+        result = json.loads(json.dumps(analysis, default=_to_json))
+        with self._cache_lock:
+            self._analyses[repo_path] = (time.time(), result)
+        return result
+
+    def validate_files(self, paths, **kwargs):
+        return self.metadata_manager.validate_files(paths, **kwargs)
+
+    def _manager(self, meta_path: str, options: Dict[str, Any]):
+        """
+        Un solo MetadataManager per meta_path: manager separati avrebbero
+        LockManager separati e non serializzerebbero le scritture tra loro.
+        Senza options si usa il manager già aperto, options diverse sono un errore.
+        """
+        meta_path = os.path.abspath(meta_path)
+        with self._cache_lock:
+            cached = self._managers.get(meta_path)
+            if cached is None:
+                manager = self.metadata_manager.MetadataManager(meta_path, **options)
+                self._managers[meta_path] = (options, manager)
+                return manager
+            opened_with, manager = cached
+            if options and options != opened_with:
+                opened_json = json.dumps(opened_with, sort_keys=True)
+                raise RpcError(
+                    INVALID_PARAMS, f"{meta_path} already open with options {opened_json}"
+                )
+            return manager
+
+    def call_metadata(self, name: str, params: Dict[str, Any]) -> Any:
+        if name.startswith("_") or not callable(
+            getattr(self.metadata_manager.MetadataManager, name, None)
+        ):
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: metadata.{name}")
+        if "meta_path" not in params:
+            raise RpcError(INVALID_PARAMS, "Missing param: meta_path")
+
+        try:
+            manager = self._manager(params["meta_path"], params.get("options") or {})
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, f"Invalid options: {e}")
+        return _call_with_params(
+            getattr(manager, name), params.get("args") or [], params.get("kwargs") or {}
+        )
+
+    # ===== Dispatch =====
+
+    def dispatch(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Esegue una richiesta JSON-RPC, None per le notification"""
+        if not isinstance(request, dict) or request.get("jsonrpc") != JSONRPC_VERSION \
+                or not isinstance(request.get("method"), str):
+            return self._error(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+
+        try:
+            if method.startswith("metadata."):
+                if not isinstance(params, dict):
+                    raise RpcError(INVALID_PARAMS, "metadata.* params must be an object")
+                result = self.call_metadata(method[len("metadata."):], params)
+            elif method in ("ping", "shutdown", "analyze", "validate_files"):
+                if isinstance(params, list):
+                    result = _call_with_params(getattr(self, method), params, {})
+                else:
+                    result = _call_with_params(getattr(self, method), [], params)
+            else:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        except RpcError as e:
+            return self._error(request_id, e.code, e.message)
+        except Exception as e:
+            return self._error(request_id, SERVER_ERROR, f"{type(e).__name__}: {e}")
+
+        if "id" not in request:
+            return None
+        return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": result}
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {
+            "jsonrpc": JSONRPC_VERSION,
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }
+
+    # ===== Server =====
+
+    def _begin_request(self) -> bool:
+        """Registra una richiesta in corso, False se il daemon sta chiudendo"""
+        with self._active_cond:
+            if self._draining:
+                return False
+            self._active += 1
+            self.requests += 1
+            self.last_request = time.time()
+            return True
+
+    def _end_request(self) -> None:
+        with self._active_cond:
+            self._active -= 1
+            self.last_request = time.time()
+            self._active_cond.notify_all()
+
+    def _handle_connection(self, conn: socket.socket) -> None:
+        try:
+            with conn, conn.makefile("rwb") as stream:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    if not self._begin_request():
+                        break
+                    try:
+                        try:
+                            response = self.dispatch(json.loads(line))
+                        except json.JSONDecodeError:
+                            response = self._error(None, PARSE_ERROR, "Parse error")
+                        if response is not None:
+                            stream.write(
+                                json.dumps(response, default=str).encode("utf-8") + b"\n"
+                            )
+                            stream.flush()
+                    finally:
+                        # Conclusa solo dopo l'invio: il drain non tronca la risposta
+                        self._end_request()
+                    if self._stop.is_set():
+                        break
+        except OSError:
+            pass  # client disconnesso o connessione chiusa dal drain
+        finally:
+            with self._active_cond:
+                self._handlers.pop(threading.current_thread(), None)
+
+    def _drain(self) -> None:
+        """Attende le richieste in corso, chiude le connessioni e i manager"""
+        with self._active_cond:
+            self._draining = True
+            while self._active:
+                self._active_cond.wait()
+            handlers = dict(self._handlers)
+
+        # Sblocca gli handler fermi in lettura su connessioni idle
+        for conn in handlers.values():
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in handlers:
+            thread.join()
+
+        # Scrive i delta pendenti dell'indice prima dell'uscita
+        with self._cache_lock:
+            managers = [manager for _, manager in self._managers.values()]
+        for manager in managers:
+            manager.close()
+
+    def serve_forever(self) -> None:
+        """Accetta connessioni finché shutdown o idle_timeout"""
+        if os.path.exists(self.socket_path):
+            if is_running(self.socket_path):
+                raise RuntimeError(f"Daemon already running on {self.socket_path}")
+            os.unlink(self.socket_path)  # socket stale
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # socket accessibile solo all'utente
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        server.settimeout(0.5)
+        self._server = server
+        print(f"Analyzer daemon listening on {self.socket_path} (pid {os.getpid()})")
+
+        try:
+            while not self._stop.is_set():
+                with self._active_cond:
+                    idle = (
+                        self.idle_timeout and not self._active
+                        and time.time() - self.last_request > self.idle_timeout
+                    )
+                if idle:
+                    print("Idle timeout reached, shutting down")
+                    break
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                thread = threading.Thread(target=self._handle_connection, args=(conn,))
+                with self._active_cond:
+                    self._handlers[thread] = conn
+                thread.start()
+        finally:
+            # Prima nessuna nuova connessione, poi attesa delle richieste in corso
+            server.close()
+            self._drain()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+# ===== Client =====
+
+def call(method: str, params: Any = None, socket_path: Optional[str] = None,
+         timeout: Optional[float] = None) -> Any:
+    """Esegue una chiamata JSON-RPC sul daemon, solleva RuntimeError sugli errori"""
+    request = {"jsonrpc": JSONRPC_VERSION, "id": 1, "method": method}
+    if params is not None:
+        request["params"] = params
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline())
+
+    if "error" in response:
+        error = response["error"]
+        raise RuntimeError(f"RPC error {error['code']}: {error['message']}")
+    return response["result"]
+
+
+def is_running(socket_path: Optional[str] = None) -> bool:
+    """True se un daemon risponde sul socket"""
+    try:
+        call("ping", socket_path=socket_path, timeout=1.0)
+        return True
+    except (OSError, ValueError, RuntimeError):
+        return False
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="spec-zero-lite analyzer daemon")
+    parser.add_argument("--socket", default=None, help="Unix socket path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Start the daemon")
+    serve_parser.add_argument(
+        "--idle-timeout", type=float, default=None,
+        help="Shut down after N seconds without requests",
+    )
+
+    call_parser = subparsers.add_parser("call", help="Call a daemon method")
+    call_parser.add_argument("method")
+    call_parser.add_argument("params", nargs="?", default=None, help="JSON params")
+
+    subparsers.add_parser("status", help="Check if the daemon is running")
+    subparsers.add_parser("stop", help="Stop the daemon")
+
+    args = parser.parse_args()
+    socket_path = args.socket or default_socket_path()
+
+    if args.command == "serve":
+        # Import dei moduli skill dalla stessa directory dello script
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        AnalyzerDaemon(socket_path, idle_timeout=args.idle_timeout).serve_forever()
+    elif args.command == "call":
+        params = json.loads(args.params) if args.params else None
+        try:
+            print(json.dumps(call(args.method, params, socket_path), indent=2))
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif args.command == "status":
+        running = is_running(socket_path)
+        print(f"Daemon {'running' if running else 'not running'} on {socket_path}")
+        sys.exit(0 if running else 1)
+    elif args.command == "stop":
+        if not is_running(socket_path):
+            print(f"Daemon not running on {socket_path}")
+            sys.exit(1)
+        call("shutdown", socket_path=socket_path)
+        print("Daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
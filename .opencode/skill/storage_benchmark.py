@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Storage Benchmark
+
+Confronta le modalità di storage di MetadataManager sugli artifact di _meta/:
+- plain, gzip, zstd, zstd + dizionario, con e senza dedup
+- Disk usage (byte logici e blocchi allocati)
+- Latenza di scrittura e di lettura (load_node_spec / load_summary)
+
+I contenuti sono sintetici ma costruiti sul template node-spec-v0, così il
+boilerplate condiviso è rappresentativo di un'analisi reale.
+"""
+
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from metadata_manager import MetadataManager, _import_zstd
+
+TEMPLATE_PATH = (
+    Path(__file__).resolve().parent.parent / "template" / "type" / "node-spec-v0.template.md"
+)
+
+MODES = [
+    {"name": "plain", "compression": None, "dedup": False, "dict": False},
+    {"name": "gzip", "compression": "gzip", "dedup": False, "dict": False},
+    {"name": "gzip+dedup", "compression": "gzip", "dedup": True, "dict": False},
+    {"name": "zstd", "compression": "zstd", "dedup": False, "dict": False},
+    {"name": "zstd+dict", "compression": "zstd", "dedup": False, "dict": True},
+    {"name": "zstd+dict+dedup", "compression": "zstd", "dedup": True, "dict": True},
+]
+
+
+def generate_artifacts(nodes: int, seed: int = 42) -> Dict[str, Dict[str, str]]:
+    """Genera node specs e summaries sintetici con boilerplate condiviso"""
+    rng = random.Random(seed)
+    template = TEMPLATE_PATH.read_text() if TEMPLATE_PATH.exists() else "# Node Spec\n" * 50
+    words = ["module", "service", "handler", "schema", "route", "config", "client", "worker"]
+
+    specs = {}
+    summaries = {}
+    for i in range(nodes):
+        node_id = f"{i:03d}"
+        details = "\n".join(
+            f"- {rng.choice(words)}_{rng.randint(0, 999)}: {' '.join(rng.choices(words, k=12))}"
+            for _ in range(rng.randint(10, 60))
+        )
+        specs[node_id] = f"---\nnode_id: {node_id}\nlayer: {i % 6}\n---\n{template}\n{details}\n"
+        # Circa un terzo dei summaries sono identici (nodi senza output specifico)
+        if i % 3 == 0:
+            summaries[node_id] = "## Summary\n\nNo relevant findings for this node.\n"
+        else:
+            summaries[node_id] = f"## Summary\n\n{details[: len(details) // 3]}\n"
+
+    return {"specs": specs, "summaries": summaries}
+
+
+def disk_usage(path: Path) -> Dict[str, int]:
+    """Byte logici e allocati (st_blocks) sotto path"""
+    apparent = 0
+    allocated = 0
+    files = 0
+    for file in path.rglob("*"):
+        if file.is_file():
+            st = file.stat()
+            apparent += st.st_size
+            allocated += getattr(st, "st_blocks", 0) * 512 or st.st_size
+            files += 1
+    return {"files": files, "apparent_bytes": apparent, "allocated_bytes": allocated}
+
+
+def run_mode(mode: Dict[str, Any], artifacts: Dict[str, Dict[str, str]],
+             workdir: Path, rounds: int) -> Dict[str, Any]:
+    """Scrive e rilegge gli artifact in una modalità, ritorna le misure"""
+    meta_path = workdir / mode["name"] / "_meta"
+    specs = artifacts["specs"]
+    summaries = artifacts["summaries"]
+
+    # close() prima che run_benchmark rimuova la workdir
+    with MetadataManager(
+        str(meta_path), compression=mode["compression"], dedup=mode["dedup"]
+    ) as manager:
+        if mode["dict"]:
+            # Addestramento su un campione, come farebbe una run precedente
+            sample_ids = list(specs)[: max(10, len(specs) // 5)]
+            for node_id in sample_ids:
+                manager.save_node_spec(node_id, specs[node_id])
+                manager.save_summary(node_id, summaries[node_id])
+            manager.train_compression_dict()
+
+        start = time.perf_counter()
+        for node_id in specs:
+            manager.save_node_spec(node_id, specs[node_id])
+            manager.save_summary(node_id, summaries[node_id])
+        write_s = time.perf_counter() - start
+
+        latencies: List[float] = []
+        for _ in range(rounds):
+            for node_id in specs:
+                t0 = time.perf_counter()
+                manager.load_node_spec(node_id)
+                manager.load_summary(node_id)
+                latencies.append(time.perf_counter() - t0)
+
+    latencies.sort()
+    # Tutto ciò che serve per rileggere gli artifact, dizionari zstd inclusi
+    usage = {"files": 0, "apparent_bytes": 0, "allocated_bytes": 0}
+    for subdir in ("02-nodes", "cache", "blobs", "dicts"):
+        if (meta_path / subdir).exists():
+            for key, value in disk_usage(meta_path / subdir).items():
+                usage[key] += value
+
+    return {
+        "mode": mode["name"],
+        **usage,
+        "write_total_ms": write_s * 1000,
+        "read_mean_us": sum(latencies) / len(latencies) * 1e6,
+        "read_p95_us": latencies[int(len(latencies) * 0.95)] * 1e6,
+    }
+
+
+def run_benchmark(nodes: int = 200, rounds: int = 5,
+                  workdir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Esegue il benchmark su tutte le modalità disponibili"""
+    artifacts = generate_artifacts(nodes)
+    has_zstd = _import_zstd() is not None
+    base = Path(workdir) if workdir else Path(tempfile.mkdtemp(prefix="meta-bench-"))
+
+    results = []
+    try:
+        for mode in MODES:
+            if mode["compression"] == "zstd" and not has_zstd:
+                print(f"Skipping {mode['name']}: zstandard not installed")
+                continue
+            results.append(run_mode(mode, artifacts, base, rounds))
+    finally:
+        if not workdir:
+            shutil.rmtree(base, ignore_errors=True)
+
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark storage modes of _meta/")
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Output JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.nodes, args.rounds)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    plain = results[0]["apparent_bytes"]
+    print(f"{'mode':<18}{'files':>7}{'bytes':>12}{'ratio':>8}{'alloc':>12}"
+          f"{'write ms':>10}{'read us':>10}{'p95 us':>10}")
+    for r in results:
+        print(
+            f"{r['mode']:<18}{r['files']:>7}{r['apparent_bytes']:>12}"
+            f"{plain / r['apparent_bytes']:>7.1f}x{r['allocated_bytes']:>12}"
+            f"{r['write_total_ms']:>10.1f}{r['read_mean_us']:>10.1f}{r['read_p95_us']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()